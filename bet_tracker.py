@@ -2,24 +2,119 @@
 Bet Tracking System
 
 Track your bets and calculate ROI over time
+
+The history is stored as CSV by default. Give the tracker a file name ending
+in .parquet to store it as Parquet instead, which keeps column types and
+loads much faster for long histories.
 """
 
+import csv
+import heapq
+import os
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from pandas.api.types import union_categoricals
+from datetime import date
+
+
+BET_COLUMNS = [
+    'Date', 'Player', 'Stat', 'Line', 'Bet_Type',
+    'Prediction', 'Actual', 'Amount', 'Result', 'Profit',
+    'Edge_Percent', 'Confidence_Percent', 'Notes'
+]
+
+# Fixed column types so the history loads in a single pass without inference.
+# Result categories are taken from the file, so hand-entered values (e.g.
+# 'Push') survive a load/save; settling adds Win/Loss if they are missing.
+# Amount and Line stay float64: profits are money and results compare
+# against the line exactly.
+DTYPE_MAP = {
+    'Player': 'string',
+    'Stat': 'category',
+    'Bet_Type': 'category',
+    'Result': 'category',
+    'Amount': 'float64',
+    'Line': 'float64',
+    'Edge_Percent': 'float32',
+    'Confidence_Percent': 'float32',
+}
 
 
 class BetTracker:
     def __init__(self, csv_file='bet_history.csv'):
         self.csv_file = csv_file
+        self._parquet = csv_file.endswith('.parquet')
+        # New bets are buffered as plain dicts and only merged into the
+        # DataFrame when it is read (see the `bets` property)
+        self._new_rows = []
         try:
-            self.bets = pd.read_csv(csv_file)
-            self.bets['Date'] = pd.to_datetime(self.bets['Date'])
+            if self._parquet:
+                # Copy out of the read-only Arrow buffers so bets can be settled in place
+                self._bets = pd.read_parquet(csv_file).copy()
+            else:
+                self._bets = pd.read_csv(csv_file, dtype=DTYPE_MAP, parse_dates=['Date'], engine='c')
         except FileNotFoundError:
-            self.bets = pd.DataFrame(columns=[
-                'Date', 'Player', 'Stat', 'Line', 'Bet_Type', 
-                'Prediction', 'Actual', 'Amount', 'Result', 'Profit',
-                'Edge_Percent', 'Confidence_Percent', 'Notes'
-            ])
+            self._bets = self._to_frame([], BET_COLUMNS)
+        self._fieldnames = list(self._bets.columns)
+        
+        # Row labels of pending/settled bets and running totals over the
+        # settled ones, kept up to date by add_bet/update_results
+        self._index_results(self._bets)
+        
+        # Append handle for new bets, opened on the first add_bet. Writes are
+        # block-buffered, so call close() (or use the tracker as a context
+        # manager) to make sure the last bets reach the file.
+        self._csv_fp = None
+        self._writer = None
+    
+    @property
+    def bets(self):
+        """All tracked bets as a DataFrame"""
+        if self._new_rows:
+            new_bets = self._to_frame(self._new_rows, self._fieldnames)
+            if len(self._bets) > 0:
+                self._bets = self._concat_bets(self._bets, new_bets)
+            else:
+                self._bets = new_bets
+            self._new_rows = []
+        return self._bets
+    
+    @bets.setter
+    def bets(self, df):
+        self._bets = df
+        self._new_rows = []
+        self._index_results(df)
+    
+    def _index_results(self, df):
+        """Rebuild the pending/settled row sets and summary totals from df"""
+        is_pending = df['Result'] == 'Pending'
+        completed = df[~is_pending]
+        self._pending_idx = set(df.index[is_pending].tolist())
+        self._completed_idx = set(completed.index.tolist())
+        self._stats = {
+            'wins': int((completed['Result'] == 'Win').sum()),
+            'losses': int((completed['Result'] == 'Loss').sum()),
+            'wagered': float(completed['Amount'].sum()),
+            'profit': float(completed['Profit'].sum()),
+        }
+    
+    @staticmethod
+    def _to_frame(rows, columns):
+        """Build a bets DataFrame with the same column types as a loaded history"""
+        df = pd.DataFrame(rows, columns=columns)
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df.astype({col: dtype for col, dtype in DTYPE_MAP.items() if col in df.columns})
+    
+    @staticmethod
+    def _concat_bets(old, new):
+        """Concatenate bet frames, keeping categorical columns categorical"""
+        old, new = old.copy(deep=False), new.copy(deep=False)
+        for col in old.columns:
+            if isinstance(old[col].dtype, pd.CategoricalDtype) and old[col].dtype != new[col].dtype:
+                categories = union_categoricals([old[col], new[col]], ignore_order=True).categories
+                old[col] = old[col].cat.set_categories(categories)
+                new[col] = new[col].cat.set_categories(categories)
+        return pd.concat([old, new], ignore_index=True)
     
     def add_bet(self, player, stat, line, bet_type, prediction, amount, 
                 edge_pct, confidence_pct, notes=''):
@@ -38,7 +133,7 @@ class BetTracker:
         - notes: Any additional notes
         """
         new_bet = {
-            'Date': datetime.now().strftime('%Y-%m-%d'),
+            'Date': date.today().isoformat(),
             'Player': player,
             'Stat': stat,
             'Line': line,
@@ -53,8 +148,9 @@ class BetTracker:
             'Notes': notes
         }
         
-        self.bets = pd.concat([self.bets, pd.DataFrame([new_bet])], ignore_index=True)
-        self.save()
+        self._new_rows.append(new_bet)
+        self._pending_idx.add(len(self._bets) + len(self._new_rows) - 1)
+        self._append_row(new_bet)
         
         print(f"✓ Bet added: {player} {bet_type} {line} {stat} (${amount})")
     
@@ -66,52 +162,81 @@ class BetTracker:
         - index: Row index in DataFrame
         - actual_value: Actual stat value achieved
         """
-        bet = self.bets.loc[index]
+        return self.update_results([(index, actual_value)])[0]
+    
+    def update_results(self, pairs):
+        """
+        Settle several bets at once and save the history a single time
+        
+        Parameters:
+        - pairs: List of (index, actual_value) tuples
+        
+        Returns an array with the profit of each settled bet
+        """
+        idx = np.array([p[0] for p in pairs])
+        actual = np.array([p[1] for p in pairs], dtype=np.float64)
+        bets = self.bets.loc[idx]
         
-        # Determine if bet won
-        if bet['Bet_Type'] == 'OVER':
-            won = actual_value > bet['Line']
-        else:  # UNDER
-            won = actual_value < bet['Line']
+        # Determine which bets won
+        lines = bets['Line'].to_numpy(dtype=np.float64)
+        is_over = bets['Bet_Type'].to_numpy() == 'OVER'
+        won = np.where(is_over, actual > lines, actual < lines)
         
         # Calculate profit (assuming -110 odds)
-        if won:
-            profit = bet['Amount'] * 0.909  # Win amount at -110
-            result = 'Win'
-        else:
-            profit = -bet['Amount']
-            result = 'Loss'
+        amount = bets['Amount'].to_numpy(dtype=np.float64)
+        profit = np.where(won, amount * 0.909, -amount)
+        result = np.where(won, 'Win', 'Loss')
+        
+        # Back out bets that are being re-settled before adding the new results
+        old_result = bets['Result'].to_numpy()
+        resettled = old_result != 'Pending'
+        if resettled.any():
+            self._stats['wins'] -= int((old_result == 'Win').sum())
+            self._stats['losses'] -= int((old_result == 'Loss').sum())
+            self._stats['wagered'] -= float(amount[resettled].sum())
+            self._stats['profit'] -= float(np.nansum(bets['Profit'].to_numpy(dtype=np.float64)[resettled]))
+        
+        self._stats['wins'] += int(won.sum())
+        self._stats['losses'] += int((~won).sum())
+        self._stats['wagered'] += float(amount.sum())
+        self._stats['profit'] += float(profit.sum())
         
         # Update DataFrame
-        self.bets.at[index, 'Actual'] = actual_value
-        self.bets.at[index, 'Result'] = result
-        self.bets.at[index, 'Profit'] = profit
+        results = self.bets['Result'].cat
+        missing = [r for r in ('Win', 'Loss') if r not in results.categories]
+        if missing:
+            self.bets['Result'] = results.add_categories(missing)
+        self.bets.loc[idx, 'Actual'] = actual
+        self.bets.loc[idx, 'Result'] = result
+        self.bets.loc[idx, 'Profit'] = profit
+        self._pending_idx.difference_update(idx.tolist())
+        self._completed_idx.update(idx.tolist())
         
         self.save()
         
-        print(f"✓ Bet updated: {bet['Player']} scored {actual_value} "
-              f"({result}, ${profit:+.2f})")
+        for player, value, res, prof in zip(bets['Player'], actual, result, profit):
+            print(f"✓ Bet updated: {player} scored {value:g} "
+                  f"({res}, ${prof:+.2f})")
         
         return profit
     
     def get_pending_bets(self):
         """Get all pending bets"""
-        return self.bets[self.bets['Result'] == 'Pending']
+        return self.bets.loc[sorted(self._pending_idx)]
     
     def get_summary(self):
         """Get summary statistics"""
-        completed = self.bets[self.bets['Result'] != 'Pending']
+        total_bets = len(self._completed_idx)
         
-        if len(completed) == 0:
+        if total_bets == 0:
             return "No completed bets yet."
         
-        total_bets = len(completed)
-        wins = len(completed[completed['Result'] == 'Win'])
-        losses = len(completed[completed['Result'] == 'Loss'])
+        wins = self._stats['wins']
+        losses = self._stats['losses']
         win_rate = wins / total_bets * 100
         
-        total_wagered = completed['Amount'].sum()
-        total_profit = completed['Profit'].sum()
+        total_wagered = self._stats['wagered']
+        total_profit = self._stats['profit']
         roi = (total_profit / total_wagered) * 100
         
         summary = f"""
@@ -132,15 +257,48 @@ ROI: {roi:+.2f}%
 RECENT BETS:
 {'='*80}
 """
-        recent = completed.tail(10)[['Date', 'Player', 'Bet_Type', 'Line', 
+        recent_idx = sorted(heapq.nlargest(10, self._completed_idx))
+        recent = self.bets.loc[recent_idx, ['Date', 'Player', 'Bet_Type', 'Line', 
                                      'Actual', 'Result', 'Profit']]
         summary += recent.to_string(index=False)
         
         return summary
     
     def save(self):
-        """Save to CSV"""
-        self.bets.to_csv(self.csv_file, index=False)
+        """Save the full history to disk"""
+        self.close()
+        if self._parquet:
+            self.bets.to_parquet(self.csv_file, compression='zstd', index=False)
+        else:
+            self.bets.to_csv(self.csv_file, index=False)
+    
+    def _append_row(self, row):
+        """Append a single bet to the CSV without rewriting the history"""
+        if self._parquet:
+            # Parquet files can't be appended to, so rewrite the history
+            self.save()
+            return
+        if self._csv_fp is None:
+            write_header = not os.path.exists(self.csv_file) or os.path.getsize(self.csv_file) == 0
+            self._csv_fp = open(self.csv_file, 'a', newline='', buffering=1 << 16)
+            self._writer = csv.DictWriter(self._csv_fp, fieldnames=self._fieldnames,
+                                          extrasaction='ignore')
+            if write_header:
+                self._writer.writeheader()
+        self._writer.writerow(row)
+    
+    def close(self):
+        """Flush buffered bets to disk and release the history file"""
+        if self._csv_fp is not None:
+            self._csv_fp.close()
+            self._csv_fp = None
+            self._writer = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def export_detailed_report(self, filename='bet_report.csv'):
         """Export detailed report"""
@@ -221,6 +379,9 @@ if __name__ == "__main__":
    pending = tracker.get_pending_bets()
    # Find the index of your bet
    tracker.update_result(index=0, actual_value=27)
+   
+   # Or settle the whole night at once
+   tracker.update_results([(0, 27), (1, 12)])
 
 3. Check your performance:
    
@@ -229,4 +390,14 @@ if __name__ == "__main__":
 4. Export detailed report:
    
    tracker.export_detailed_report('my_bets_2024.csv')
+
+5. Close the tracker when you're done so buffered bets are written:
+   
+   tracker.close()
+   
+   # Or let a with-block do it
+   with BetTracker() as tracker:
+       tracker.add_bet(...)
     """)
+    
+    tracker.close()
@@ -3,15 +3,130 @@ NBA Data Collection Module
 Fetches player stats and game data from NBA Stats API
 """
 
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from types import MappingProxyType
+import ijson
 import json
+import orjson
+
+
+# How long cached API responses stay fresh (seconds)
+GAME_LOG_CACHE_TTL = 60 * 60
+ROSTER_CACHE_TTL = 24 * 60 * 60
+PLAYERS_CACHE_TTL = 24 * 60 * 60
+
+# How often get_current_season recomputes the season string (seconds)
+SEASON_RECHECK_INTERVAL = 60 * 60
+
+_TEAM_MAPPING = MappingProxyType({
+    'ATL': 1610612737, 'BOS': 1610612738, 'BKN': 1610612751, 'CHA': 1610612766,
+    'CHI': 1610612741, 'CLE': 1610612739, 'DAL': 1610612742, 'DEN': 1610612743,
+    'DET': 1610612765, 'GSW': 1610612744, 'HOU': 1610612745, 'IND': 1610612754,
+    'LAC': 1610612746, 'LAL': 1610612747, 'MEM': 1610612763, 'MIA': 1610612748,
+    'MIL': 1610612749, 'MIN': 1610612750, 'NOP': 1610612740, 'NYK': 1610612752,
+    'OKC': 1610612760, 'ORL': 1610612753, 'PHI': 1610612755, 'PHX': 1610612756,
+    'POR': 1610612757, 'SAC': 1610612758, 'SAS': 1610612759, 'TOR': 1610612761,
+    'UTA': 1610612762, 'WAS': 1610612764
+})
+
+# Column types for the API result sets. Counting stats are float32 so games
+# with missing values still share one schema; IDs that carry leading zeros
+# (Game_ID, SEASON_ID) stay strings.
+_GAMELOG_DTYPES = {
+    'SEASON_ID': object, 'Player_ID': 'int64', 'PLAYER_ID': 'int64', 'TEAM_ID': 'int64',
+    'Game_ID': object, 'GAME_ID': object, 'GAME_DATE': 'datetime64[ns]',
+    'MATCHUP': object, 'WL': object, 'MIN': 'float32',
+    'FGM': 'float32', 'FGA': 'float32', 'FG_PCT': 'float32',
+    'FG3M': 'float32', 'FG3A': 'float32', 'FG3_PCT': 'float32',
+    'FTM': 'float32', 'FTA': 'float32', 'FT_PCT': 'float32',
+    'OREB': 'float32', 'DREB': 'float32', 'REB': 'float32', 'AST': 'float32',
+    'STL': 'float32', 'BLK': 'float32', 'TOV': 'float32', 'PF': 'float32',
+    'PTS': 'float32', 'PLUS_MINUS': 'float32', 'VIDEO_AVAILABLE': 'int8',
+}
+_ROSTER_DTYPES = {'TeamID': 'int64', 'PLAYER_ID': 'int64', 'PLAYER': object}
+_PLAYERS_DTYPES = {'PERSON_ID': 'int64', 'TEAM_ID': 'int64', 'DISPLAY_FIRST_LAST': object}
+
+# Sorted copies of the mapping for vectorized lookups
+_TEAM_ABBREVS = np.array(sorted(_TEAM_MAPPING))
+_TEAM_IDS = np.array([_TEAM_MAPPING[abbrev] for abbrev in _TEAM_ABBREVS], dtype=np.int64)
+
+
+def vec_team_id(abbrevs):
+    """
+    Vectorized get_team_id_from_abbrev for an array of abbreviations
+    Unknown abbreviations map to -1
+    """
+    abbrevs = np.char.upper(np.asarray(abbrevs, dtype=str))
+    pos = np.minimum(np.searchsorted(_TEAM_ABBREVS, abbrevs), len(_TEAM_ABBREVS) - 1)
+    return np.where(_TEAM_ABBREVS[pos] == abbrevs, _TEAM_IDS[pos], -1)
+
+
+def _rows_to_df(headers, rows, dtype_map):
+    """
+    Build a DataFrame from an API result set column by column
+    
+    The row-major rowSet is transposed once and each column is converted
+    straight to its dtype from dtype_map. Columns not in the map (or whose
+    values don't fit the declared dtype) are left to pandas to infer.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(headers)
+    return _columns_to_df(headers, columns, dtype_map)
+
+
+def _columns_to_df(headers, columns, dtype_map):
+    """Build a DataFrame from per-column value sequences (see _rows_to_df)"""
+    data = {}
+    for header, values in zip(headers, columns):
+        dtype = dtype_map.get(header)
+        if dtype == 'datetime64[ns]':
+            try:
+                data[header] = pd.to_datetime(pd.Series(values, dtype=object), format='mixed').astype(dtype)
+                continue
+            except (TypeError, ValueError):
+                pass  # e.g. a 'TBD' date; keep the raw values
+        elif dtype is not None:
+            try:
+                data[header] = np.asarray(values, dtype=dtype)
+                continue
+            except (TypeError, ValueError):
+                pass
+        data[header] = list(values)
+    
+    return pd.DataFrame(data, columns=headers)
+
+
+class RateLimiter:
+    """
+    Spaces out API requests so at most one starts every `interval` seconds.
+    Safe to share between threads: each caller reserves the next free slot
+    and sleeps until it arrives.
+    """
+    def __init__(self, interval=0.6):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
 
 class NBADataCollector:
-    def __init__(self):
+    def __init__(self, request_interval=0.6, cache_dir='.nba_cache'):
         self.base_url = "https://stats.nba.com/stats"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -21,18 +136,86 @@ class NBADataCollector:
             'x-nba-stats-token': 'true',
             'Accept-Language': 'en-US,en;q=0.9',
         }
+        self.rate_limiter = RateLimiter(request_interval)
+        self.cache_dir = cache_dir
+        self._season_cached = (None, 0.0)
+        
+        # Player list used by search_player, loaded on first search
+        self._players = None
+        self._player_names = None
+        self._players_season = None
+        
+        # One keep-alive session for all requests so the TLS handshake
+        # with stats.nba.com is only paid once per pooled connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
         
     def get_current_season(self):
-        """Get current NBA season string (e.g., '2024-25')"""
+        """
+        Get current NBA season string (e.g., '2024-25')
+        The result is reused for an hour since it only changes once a year
+        """
+        season, computed_at = self._season_cached
+        if season is not None and time.monotonic() - computed_at < SEASON_RECHECK_INTERVAL:
+            return season
+        
         now = datetime.now()
         if now.month >= 10:  # Season starts in October
-            return f"{now.year}-{str(now.year + 1)[-2:]}"
+            season = f"{now.year}-{str(now.year + 1)[-2:]}"
         else:
-            return f"{now.year - 1}-{str(now.year)[-2:]}"
+            season = f"{now.year - 1}-{str(now.year)[-2:]}"
+        
+        self._season_cached = (season, time.monotonic())
+        return season
     
-    def fetch_player_game_logs(self, player_id, season=None):
+    def _get(self, url, params, timeout=10):
+        """Rate-limited GET through the shared session"""
+        self.rate_limiter.wait()
+        return self.session.get(url, params=params, timeout=timeout)
+    
+    def _cache_path(self, url, params):
+        """File holding the cached response for (url, params)"""
+        # Stringify values so numpy and Python ints (e.g. roster PLAYER_IDs vs
+        # literal IDs) hash to the same key
+        key = json.dumps([url, sorted((k, str(v)) for k, v in params.items())])
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.json')
+    
+    def _get_json(self, url, params, timeout=10, ttl=None, force_refresh=False):
+        """
+        GET a JSON payload, served from the on-disk cache while it is younger
+        than `ttl` seconds. The raw response body is cached, not the parsed
+        DataFrame, so callers are free to change how they build frames.
+        """
+        path = None
+        if self.cache_dir and ttl:
+            path = self._cache_path(url, params)
+            if not force_refresh and os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+                with open(path, 'rb') as f:
+                    return orjson.loads(f.read())
+        
+        response = self._get(url, params, timeout=timeout)
+        data = orjson.loads(response.content)
+        
+        if path and response.ok:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_path, path)
+        
+        return data
+    
+    def fetch_player_game_logs(self, player_id, season=None, force_refresh=False):
         """
         Fetch game logs for a specific player
+        Responses are cached on disk for GAME_LOG_CACHE_TTL seconds
         """
         if season is None:
             season = self.get_current_season()
@@ -45,13 +228,13 @@ class NBADataCollector:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            data = response.json()
+            data = self._get_json(url, params, timeout=10, ttl=GAME_LOG_CACHE_TTL,
+                                  force_refresh=force_refresh)
             
             if 'resultSets' in data and len(data['resultSets']) > 0:
                 headers = data['resultSets'][0]['headers']
                 rows = data['resultSets'][0]['rowSet']
-                df = pd.DataFrame(rows, columns=headers)
+                df = _rows_to_df(headers, rows, _GAMELOG_DTYPES)
                 return df
             
         except Exception as e:
@@ -59,9 +242,65 @@ class NBADataCollector:
         
         return pd.DataFrame()
     
-    def fetch_team_roster(self, team_id, season=None):
+    def fetch_game_logs_for_players(self, player_ids, season=None, max_workers=6,
+                                    force_refresh=False):
+        """
+        Fetch game logs for several players concurrently
+        
+        Requests overlap on a thread pool while the shared rate limiter keeps
+        them within the API's request budget.
+        Returns a dict of {player_id: DataFrame} in the order of player_ids,
+        skipping players with no game logs
+        """
+        game_logs = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_player_game_logs, player_id, season,
+                                force_refresh): player_id
+                for player_id in player_ids
+            }
+            for future in as_completed(futures):
+                game_logs[futures[future]] = future.result()
+        
+        return {
+            player_id: game_logs[player_id] for player_id in player_ids
+            if len(game_logs[player_id]) > 0
+        }
+    
+    def combine_game_logs(self, game_logs):
+        """
+        Combine per-player game log DataFrames into one
+        
+        Frames are built against the same _GAMELOG_DTYPES schema, so most
+        columns are joined with a single np.concatenate into one allocation.
+        A column whose dtype differs between frames (e.g. all null in one
+        player's log, so inference left it object) is joined by pd.concat,
+        which upcasts to a common dtype.
+        """
+        if not game_logs:
+            return pd.DataFrame()
+        
+        columns = game_logs[0].columns
+        if not all(df.columns.equals(columns) for df in game_logs):
+            return pd.concat(game_logs, ignore_index=True)
+        
+        combined = {}
+        for col in columns:
+            parts = [df[col] for df in game_logs]
+            dtype = parts[0].dtype
+            if all(part.dtype == dtype for part in parts):
+                combined[col] = pd.Series(
+                    np.concatenate([part.to_numpy() for part in parts])
+                ).astype(dtype)
+            else:
+                combined[col] = pd.concat(parts, ignore_index=True)
+        
+        return pd.DataFrame(combined)
+    
+    def fetch_team_roster(self, team_id, season=None, force_refresh=False):
         """
         Fetch current roster for a team
+        Responses are cached on disk for ROSTER_CACHE_TTL seconds
         """
         if season is None:
             season = self.get_current_season()
@@ -73,13 +312,13 @@ class NBADataCollector:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            data = response.json()
+            data = self._get_json(url, params, timeout=10, ttl=ROSTER_CACHE_TTL,
+                                  force_refresh=force_refresh)
             
             if 'resultSets' in data and len(data['resultSets']) > 0:
                 headers = data['resultSets'][0]['headers']
                 rows = data['resultSets'][0]['rowSet']
-                df = pd.DataFrame(rows, columns=headers)
+                df = _rows_to_df(headers, rows, _ROSTER_DTYPES)
                 return df
             
         except Exception as e:
@@ -87,10 +326,46 @@ class NBADataCollector:
         
         return pd.DataFrame()
     
-    def fetch_league_game_log(self, season=None, player_or_team='P'):
+    def _stream_result_set(self, url, params, timeout=30):
+        """
+        Stream the first result set of a response and return (headers, columns)
+        
+        The JSON is parsed incrementally while it downloads and row values are
+        appended straight into per-column lists, so the raw payload and the
+        parsed row lists never sit in memory at the same time.
+        """
+        headers = []
+        columns = None
+        col = 0
+        result_sets = 0
+        
+        self.rate_limiter.wait()
+        with self.session.get(url, params=params, stream=True, timeout=timeout) as response:
+            response.raw.decode_content = True
+            for prefix, event, value in ijson.parse(response.raw, use_float=True):
+                if prefix == 'resultSets.item' and event == 'start_map':
+                    result_sets += 1
+                    if result_sets > 1:
+                        break
+                elif prefix == 'resultSets.item.headers.item':
+                    headers.append(value)
+                elif prefix == 'resultSets.item.rowSet' and event == 'start_array':
+                    columns = [[] for _ in headers]
+                elif prefix == 'resultSets.item.rowSet.item' and event == 'start_array':
+                    col = 0
+                elif prefix == 'resultSets.item.rowSet.item.item':
+                    columns[col].append(value)
+                    col += 1
+        
+        return headers, columns
+    
+    def fetch_league_game_log(self, season=None, player_or_team='P', streaming=True):
         """
         Fetch game logs for all players in the league
         This is a large dataset - use sparingly
+        
+        The response is parsed as it streams in; pass streaming=False to
+        download the whole payload first and parse it in one go
         """
         if season is None:
             season = self.get_current_season()
@@ -107,13 +382,21 @@ class NBADataCollector:
         
         try:
             print(f"Fetching league game logs for {season}... (this may take a moment)")
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            data = response.json()
+            if streaming:
+                headers, columns = self._stream_result_set(url, params, timeout=30)
+                if columns is not None:
+                    df = _columns_to_df(headers, columns, _GAMELOG_DTYPES)
+                    print(f"Fetched {len(df)} game logs")
+                    return df
+                return pd.DataFrame()
+            
+            response = self._get(url, params, timeout=30)
+            data = orjson.loads(response.content)
             
             if 'resultSets' in data and len(data['resultSets']) > 0:
                 headers = data['resultSets'][0]['headers']
                 rows = data['resultSets'][0]['rowSet']
-                df = pd.DataFrame(rows, columns=headers)
+                df = _rows_to_df(headers, rows, _GAMELOG_DTYPES)
                 print(f"Fetched {len(df)} game logs")
                 return df
             
@@ -122,28 +405,48 @@ class NBADataCollector:
         
         return pd.DataFrame()
     
-    def search_player(self, player_name):
+    def _load_players(self, force_refresh=False):
         """
-        Search for a player by name and return their ID
+        Load the current-season player list once per season and keep it in
+        memory along with a lowercase copy of the names for searching
         """
+        season = self.get_current_season()
+        if not force_refresh and self._players is not None and self._players_season == season:
+            return self._players
+        
         url = f"{self.base_url}/commonallplayers"
         params = {
             'LeagueID': '00',
-            'Season': self.get_current_season(),
+            'Season': season,
             'IsOnlyCurrentSeason': '1'
         }
         
+        data = self._get_json(url, params, timeout=10, ttl=PLAYERS_CACHE_TTL,
+                              force_refresh=force_refresh)
+        
+        if 'resultSets' in data and len(data['resultSets']) > 0:
+            headers = data['resultSets'][0]['headers']
+            rows = data['resultSets'][0]['rowSet']
+            self._players = _rows_to_df(headers, rows, _PLAYERS_DTYPES)
+            self._player_names = np.char.lower(
+                self._players['DISPLAY_FIRST_LAST'].astype(str).to_numpy(dtype=str)
+            )
+            self._players_season = season
+        
+        return self._players
+    
+    def search_player(self, player_name, force_refresh=False):
+        """
+        Search for a player by name and return their ID
+        The player list is cached on disk for PLAYERS_CACHE_TTL seconds
+        """
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            data = response.json()
+            players = self._load_players(force_refresh)
             
-            if 'resultSets' in data and len(data['resultSets']) > 0:
-                headers = data['resultSets'][0]['headers']
-                rows = data['resultSets'][0]['rowSet']
-                df = pd.DataFrame(rows, columns=headers)
-                
-                # Search for player
-                matches = df[df['DISPLAY_FIRST_LAST'].str.contains(player_name, case=False)]
+            if players is not None:
+                # Search for player (plain substring match on the prebuilt lowercase names)
+                mask = np.char.find(self._player_names, player_name.lower()) >= 0
+                matches = players[mask]
                 
                 if len(matches) > 0:
                     return matches[['PERSON_ID', 'DISPLAY_FIRST_LAST', 'TEAM_ID']].to_dict('records')
@@ -157,17 +460,7 @@ class NBADataCollector:
         """
         Get team ID from abbreviation (e.g., 'PHI' -> 1610612755)
         """
-        team_mapping = {
-            'ATL': 1610612737, 'BOS': 1610612738, 'BKN': 1610612751, 'CHA': 1610612766,
-            'CHI': 1610612741, 'CLE': 1610612739, 'DAL': 1610612742, 'DEN': 1610612743,
-            'DET': 1610612765, 'GSW': 1610612744, 'HOU': 1610612745, 'IND': 1610612754,
-            'LAC': 1610612746, 'LAL': 1610612747, 'MEM': 1610612763, 'MIA': 1610612748,
-            'MIL': 1610612749, 'MIN': 1610612750, 'NOP': 1610612740, 'NYK': 1610612752,
-            'OKC': 1610612760, 'ORL': 1610612753, 'PHI': 1610612755, 'PHX': 1610612756,
-            'POR': 1610612757, 'SAC': 1610612758, 'SAS': 1610612759, 'TOR': 1610612761,
-            'UTA': 1610612762, 'WAS': 1610612764
-        }
-        return team_mapping.get(team_abbrev.upper())
+        return _TEAM_MAPPING.get(team_abbrev.upper())
     
     def save_data(self, df, filename):
         """Save DataFrame to CSV"""
@@ -199,23 +492,19 @@ def collect_sample_data():
     roster = collector.fetch_team_roster(team_id)
     print(f"Found {len(roster)} players on roster")
     
-    # Collect game logs for each player
-    all_game_logs = []
+    # Collect game logs for all players concurrently
+    player_names = dict(zip(roster['PLAYER_ID'], roster['PLAYER']))
+    print(f"Fetching game logs for {len(player_names)} players...")
     
-    for _, player in roster.iterrows():
-        player_id = player['PLAYER_ID']
-        player_name = player['PLAYER']
-        print(f"Fetching game logs for {player_name}...")
-        
-        game_logs = collector.fetch_player_game_logs(player_id)
-        if len(game_logs) > 0:
-            all_game_logs.append(game_logs)
-        
-        time.sleep(0.6)  # Rate limiting
+    game_logs = collector.fetch_game_logs_for_players(list(player_names))
+    for player_id, logs in game_logs.items():
+        print(f"  {player_names[player_id]}: {len(logs)} games")
+    
+    all_game_logs = list(game_logs.values())
     
     # Combine all game logs
     if all_game_logs:
-        combined_df = pd.concat(all_game_logs, ignore_index=True)
+        combined_df = collector.combine_game_logs(all_game_logs)
         collector.save_data(combined_df, 'data/sixers_game_logs.csv')
         return combined_df
     
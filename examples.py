@@ -10,6 +10,10 @@ from injury_impact_model import InjuryImpactModel
 from data_collector import NBADataCollector
 
 
+# Shared generator for the simulated data (seeded so runs are reproducible)
+_RNG = np.random.default_rng(42)
+
+
 def generate_sample_data():
     """
     Generate sample data for demonstration purposes
@@ -23,125 +27,78 @@ def generate_sample_data():
     MELTON_ID = 1629001
     OUBRE_ID = 1626162
     
-    # Generate games for the season
-    dates = pd.date_range('2024-10-25', periods=40, freq='2D')
+    TEAM_ID = 1610612755
     
-    # Create game data
-    games = []
-    player_stats = []
-    game_id = 20240001
-    
-    for date in dates:
-        # Embiid sits out ~40% of games (load management)
-        embiid_plays = np.random.random() > 0.4
-        
-        games.append({
-            'GAME_ID': game_id,
-            'GAME_DATE': date,
-            'MATCHUP': 'PHI vs. BOS' if np.random.random() > 0.5 else 'PHI @ BOS',
-            'TEAM_ID': 1610612755
-        })
-        
-        # Joel Embiid stats (when he plays)
-        if embiid_plays:
-            player_stats.append({
-                'GAME_ID': game_id,
-                'GAME_DATE': date,
-                'PLAYER_ID': EMBIID_ID,
-                'PLAYER_NAME': 'Joel Embiid',
-                'TEAM_ID': 1610612755,
-                'MATCHUP': games[-1]['MATCHUP'],
-                'MIN': np.random.uniform(30, 37),
-                'PTS': np.random.normal(28, 5),  # Avg 28 ppg
-                'REB': np.random.normal(11, 2),
-                'AST': np.random.normal(5, 2),
-                'FG_PCT': np.random.uniform(0.45, 0.58)
-            })
-        
+    # Per-player distributions:
+    # (id, name, MIN range, PTS with Embiid, PTS without Embiid, REB, AST, FG_PCT range)
+    # Embiid's own "without" entry is unused since he has no box score then
+    players = [
+        (EMBIID_ID, 'Joel Embiid', (30, 37), (28, 5), (28, 5), (11, 2), (5, 2), (0.45, 0.58)),
         # Tyrese Maxey (benefits when Embiid is out)
-        if embiid_plays:
-            maxey_pts = np.random.normal(24, 4)  # 24 ppg with Embiid
-        else:
-            maxey_pts = np.random.normal(30, 5)  # 30 ppg without Embiid
-        
-        player_stats.append({
-            'GAME_ID': game_id,
-            'GAME_DATE': date,
-            'PLAYER_ID': MAXEY_ID,
-            'PLAYER_NAME': 'Tyrese Maxey',
-            'TEAM_ID': 1610612755,
-            'MATCHUP': games[-1]['MATCHUP'],
-            'MIN': np.random.uniform(34, 38),
-            'PTS': maxey_pts,
-            'REB': np.random.normal(4, 1.5),
-            'AST': np.random.normal(6, 2),
-            'FG_PCT': np.random.uniform(0.42, 0.52)
-        })
-        
+        (MAXEY_ID, 'Tyrese Maxey', (34, 38), (24, 4), (30, 5), (4, 1.5), (6, 2), (0.42, 0.52)),
         # Tobias Harris (slight benefit when Embiid is out)
-        if embiid_plays:
-            harris_pts = np.random.normal(16, 3)
-        else:
-            harris_pts = np.random.normal(19, 4)
-        
-        player_stats.append({
-            'GAME_ID': game_id,
-            'GAME_DATE': date,
-            'PLAYER_ID': HARRIS_ID,
-            'PLAYER_NAME': 'Tobias Harris',
-            'TEAM_ID': 1610612755,
-            'MATCHUP': games[-1]['MATCHUP'],
-            'MIN': np.random.uniform(30, 35),
-            'PTS': harris_pts,
-            'REB': np.random.normal(6, 2),
-            'AST': np.random.normal(3, 1),
-            'FG_PCT': np.random.uniform(0.43, 0.51)
-        })
-        
+        (HARRIS_ID, 'Tobias Harris', (30, 35), (16, 3), (19, 4), (6, 2), (3, 1), (0.43, 0.51)),
         # De'Anthony Melton (moderate benefit)
-        if embiid_plays:
-            melton_pts = np.random.normal(11, 3)
-        else:
-            melton_pts = np.random.normal(14, 3.5)
-        
-        player_stats.append({
-            'GAME_ID': game_id,
-            'GAME_DATE': date,
-            'PLAYER_ID': MELTON_ID,
-            'PLAYER_NAME': "De'Anthony Melton",
-            'TEAM_ID': 1610612755,
-            'MATCHUP': games[-1]['MATCHUP'],
-            'MIN': np.random.uniform(25, 32),
-            'PTS': melton_pts,
-            'REB': np.random.normal(4, 1.5),
-            'AST': np.random.normal(3, 1.5),
-            'FG_PCT': np.random.uniform(0.39, 0.48)
-        })
-        
+        (MELTON_ID, "De'Anthony Melton", (25, 32), (11, 3), (14, 3.5), (4, 1.5), (3, 1.5), (0.39, 0.48)),
         # Kelly Oubre Jr (slight benefit)
-        if embiid_plays:
-            oubre_pts = np.random.normal(14, 3)
-        else:
-            oubre_pts = np.random.normal(16, 3.5)
-        
-        player_stats.append({
-            'GAME_ID': game_id,
-            'GAME_DATE': date,
-            'PLAYER_ID': OUBRE_ID,
-            'PLAYER_NAME': 'Kelly Oubre Jr.',
-            'TEAM_ID': 1610612755,
-            'MATCHUP': games[-1]['MATCHUP'],
-            'MIN': np.random.uniform(28, 34),
-            'PTS': oubre_pts,
-            'REB': np.random.normal(5, 1.5),
-            'AST': np.random.normal(1.5, 1),
-            'FG_PCT': np.random.uniform(0.41, 0.50)
-        })
-        
-        game_id += 1
+        (OUBRE_ID, 'Kelly Oubre Jr.', (28, 34), (14, 3), (16, 3.5), (5, 1.5), (1.5, 1), (0.41, 0.50)),
+    ]
+    n_players = len(players)
+    
+    # Generate games for the season
+    dates = pd.date_range('2024-10-25', periods=40, freq='2D')
+    n_games = len(dates)
+    game_ids = np.arange(20240001, 20240001 + n_games)
+    
+    # Embiid sits out ~40% of games (load management)
+    embiid_plays = _RNG.random(n_games) > 0.4
+    is_home = _RNG.random(n_games) > 0.5
+    
+    # Draw every stat for all (player, game) pairs at once: each distribution
+    # parameter is a (player, 1) column that broadcasts across the games
+    dists = np.array([p[2:] for p in players], dtype=np.float64)[..., None]
+    min_range, pts_with, pts_without, reb_dist, ast_dist, fg_range = (
+        dists[:, k] for k in range(dists.shape[1])
+    )
+    size = (n_players, n_games)
+    
+    minutes = _RNG.uniform(min_range[:, 0], min_range[:, 1], size).astype(np.float32)
+    pts = np.where(
+        embiid_plays,
+        _RNG.normal(pts_with[:, 0], pts_with[:, 1], size),
+        _RNG.normal(pts_without[:, 0], pts_without[:, 1], size)
+    ).astype(np.float32)
+    reb = _RNG.normal(reb_dist[:, 0], reb_dist[:, 1], size).astype(np.float32)
+    ast = _RNG.normal(ast_dist[:, 0], ast_dist[:, 1], size).astype(np.float32)
+    fg_pct = _RNG.uniform(fg_range[:, 0], fg_range[:, 1], size).astype(np.float32)
+    
+    matchups = np.where(is_home, 'PHI vs. BOS', 'PHI @ BOS')
+    
+    games_df = pd.DataFrame({
+        'GAME_ID': game_ids,
+        'GAME_DATE': dates,
+        'MATCHUP': matchups,
+        'TEAM_ID': TEAM_ID
+    })
     
-    games_df = pd.DataFrame(games)
-    player_stats_df = pd.DataFrame(player_stats)
+    player_stats_df = pd.DataFrame({
+        'GAME_ID': np.tile(game_ids, n_players),
+        'GAME_DATE': np.tile(dates, n_players),
+        'PLAYER_ID': np.repeat([p[0] for p in players], n_games),
+        'PLAYER_NAME': np.repeat([p[1] for p in players], n_games),
+        'TEAM_ID': TEAM_ID,
+        'MATCHUP': np.tile(matchups, n_players),
+        'MIN': minutes.ravel(),
+        'PTS': pts.ravel(),
+        'REB': reb.ravel(),
+        'AST': ast.ravel(),
+        'FG_PCT': fg_pct.ravel()
+    })
+    
+    # Joel Embiid only has a box score in games he plays
+    played = np.ones((n_players, n_games), dtype=bool)
+    played[0] = embiid_plays
+    player_stats_df = player_stats_df[played.ravel()].reset_index(drop=True)
     
     return games_df, player_stats_df, EMBIID_ID
 
@@ -211,7 +168,8 @@ def example_2_betting_opportunities():
         team_id=1610612755,
         betting_lines=betting_lines,
         stat='PTS',
-        min_edge=0.03  # Require 3% edge
+        min_edge=0.03,  # Require 3% edge
+        verbose=True
     )
     
     if len(opportunities) > 0:
@@ -292,7 +250,8 @@ def example_4_kelly_criterion_sizing():
         injured_player_name='Joel Embiid',
         team_id=1610612755,
         betting_lines=betting_lines,
-        stat='PTS'
+        stat='PTS',
+        verbose=True
     )
     
     if len(opportunities) > 0:
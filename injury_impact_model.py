@@ -3,21 +3,131 @@ NBA Injury Impact Betting Model
 Analyzes how player absences affect teammate performance and identifies betting opportunities
 """
 
+import math
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
+from joblib import Parallel, delayed
 from scipy import stats
+from scipy.special import ndtr
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Narrower dtypes applied to player_stats on load. Only these box score stats
+# become float32; other numeric columns (e.g. OPP_TEAM_ID) may hold values
+# float32 can't represent exactly, so they are left alone
+_STAT_COLUMNS = [
+    'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'OREB', 'DREB',
+    'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT',
+    'PLUS_MINUS', 'PRA'
+]
+_ID_COLUMNS = ['PLAYER_ID', 'TEAM_ID', 'GAME_ID']
+_CATEGORY_COLUMNS = ['MATCHUP', 'PLAYER_NAME']
+_INT32 = np.iinfo(np.int32)
+
+
+def _downcast_box_scores(player_stats):
+    """
+    Shrink the box score table the model scans: float32 stats, int32 IDs,
+    categorical matchup/name strings and GAME_DATE parsed once. Also adds
+    the int8 HOME flag used as a model feature
+    """
+    columns = {col: player_stats[col].astype('float32') for col in _STAT_COLUMNS
+               if col in player_stats and pd.api.types.is_numeric_dtype(player_stats[col])}
+    
+    for col in _ID_COLUMNS:
+        if col not in player_stats:
+            continue
+        try:
+            ids = pd.to_numeric(player_stats[col])
+        except (ValueError, TypeError):
+            continue  # Leave non-numeric IDs as they are
+        # Only narrow whole-number IDs that fit; missing or out-of-range ones keep their dtype
+        if pd.api.types.is_integer_dtype(ids) and ids.between(_INT32.min, _INT32.max).all():
+            columns[col] = ids.astype('int32')
+    
+    for col in _CATEGORY_COLUMNS:
+        if col in player_stats:
+            columns[col] = player_stats[col].astype('category')
+    
+    if 'GAME_DATE' in player_stats:
+        # Unparseable dates (e.g. 'TBD' kept raw by the collector) become NaT
+        columns['GAME_DATE'] = pd.to_datetime(player_stats['GAME_DATE'], format='mixed', errors='coerce')
+    
+    # Home games read "PHI vs. BOS"; test each distinct matchup once and map
+    # through the category codes (code -1, a missing matchup, picks the False)
+    if 'MATCHUP' in columns:
+        matchups = columns['MATCHUP'].cat
+        is_home = np.append(matchups.categories.str.contains('vs.', regex=False), False)
+        columns['HOME'] = is_home[matchups.codes].astype('int8')
+    
+    return player_stats.assign(**columns)
+
+
+def _rolling_mean_std(values, groups, window):
+    """
+    Trailing mean and sample standard deviation over `window` rows, restarting
+    whenever `groups` changes (rows of a group must be contiguous)
+    
+    Same result as groupby(groups).rolling(window, min_periods=1) with .mean()
+    and .std(), computed from running sums in a single vectorized pass.
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.asarray(groups)
+    n = len(values)
+    
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    sums = np.concatenate(([0.0], np.cumsum(x)))
+    squares = np.concatenate(([0.0], np.cumsum(x * x)))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    
+    # Each window runs from max(i - window + 1, first row of i's group) to i
+    rows = np.arange(n)
+    group_starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if n else rows
+    lo = np.maximum(rows - window + 1, group_starts[np.searchsorted(group_starts, rows, side='right') - 1])
+    hi = rows + 1
+    
+    count = counts[hi] - counts[lo]
+    total = sums[hi] - sums[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, np.nan)
+        var = np.where(count > 1, (squares[hi] - squares[lo] - total * mean) / (count - 1), np.nan)
+    
+    return mean, np.sqrt(np.maximum(var, 0))
+
+
+def _isin_sorted(values, sorted_keys):
+    """
+    Boolean mask of which `values` appear in `sorted_keys` (sorted, unique),
+    found by binary search rather than building a hash table
+    """
+    values = np.asarray(values)
+    if len(sorted_keys) == 0:
+        return np.zeros(len(values), dtype=bool)
+    
+    pos = np.searchsorted(sorted_keys, values)
+    return (pos < len(sorted_keys)) & (sorted_keys[np.minimum(pos, len(sorted_keys) - 1)] == values)
+
+
+def _fit_booster(X, y, categorical):
+    """
+    Fit the shared gradient-boosted model. Module level so joblib workers
+    receive only the training arrays, not the whole InjuryImpactModel
+    """
+    model = HistGradientBoostingRegressor(categorical_features=categorical,
+                                          max_iter=200, random_state=42)
+    return model.fit(X, y)
+
 
 class InjuryImpactModel:
     def __init__(self):
         self.player_baselines = {}
         self.injury_impacts = {}
-        self.models = {}
+        # One model per stat shared by all players, keyed by stat
+        self.global_models = {}
         
     def load_data(self, games_df, player_stats_df, injury_reports_df=None):
         """
@@ -29,27 +139,61 @@ class InjuryImpactModel:
         - injury_reports_df: Optional DataFrame with injury information
         """
         self.games = games_df
-        self.player_stats = player_stats_df
+        self.player_stats = player_stats_df = _downcast_box_scores(player_stats_df)
         self.injury_reports = injury_reports_df
+        self.global_models = {}
+        
+        # Lookups by player (oldest game first) and by team, so per-player
+        # queries slice a sorted index instead of scanning every box score
+        self._by_player = (
+            player_stats_df.sort_values('GAME_DATE', kind='stable')
+            .set_index('PLAYER_ID', drop=False)
+            .sort_index(kind='stable')
+        )
+        self._by_team = player_stats_df.set_index('TEAM_ID', drop=False).sort_index(kind='stable')
+        self._player_ids = self._by_player.index.unique()
+        self._games_played_cache = {}
+        self._feature_cache = {}
         
         print(f"Loaded {len(games_df)} games and {len(player_stats_df)} player performances")
         
+    def _player_games(self, player_id):
+        """All box scores for one player, oldest game first"""
+        try:
+            return self._by_player.loc[[player_id]]
+        except KeyError:
+            return self._by_player.iloc[:0]
+    
+    def _games_played(self, player_id):
+        """Sorted unique GAME_IDs a player appeared in, built once per player"""
+        if player_id not in self._games_played_cache:
+            self._games_played_cache[player_id] = np.unique(
+                self._player_games(player_id)['GAME_ID'].to_numpy()
+            )
+        return self._games_played_cache[player_id]
+    
+    def _team_games(self, team_id):
+        """All box scores recorded for one team"""
+        try:
+            return self._by_team.loc[[team_id]]
+        except KeyError:
+            return self._by_team.iloc[:0]
+    
     def calculate_baseline(self, player_id, stat='PTS', last_n_games=15):
         """Calculate player's baseline performance"""
-        player_games = self.player_stats[
-            self.player_stats['PLAYER_ID'] == player_id
-        ].sort_values('GAME_DATE', ascending=False)
+        player_games = self._player_games(player_id)
         
         if len(player_games) == 0:
             return None
-            
-        recent_games = player_games.head(last_n_games)
+        
+        # Games are stored oldest first, so the most recent are at the end
+        recent_games = player_games[stat].tail(last_n_games).agg(['mean', 'median', 'std', 'size'])
         
         baseline = {
-            'mean': recent_games[stat].mean(),
-            'median': recent_games[stat].median(),
-            'std': recent_games[stat].std(),
-            'sample_size': len(recent_games)
+            'mean': recent_games['mean'],
+            'median': recent_games['median'],
+            'std': recent_games['std'],
+            'sample_size': int(recent_games['size'])
         }
         
         return baseline
@@ -61,21 +205,18 @@ class InjuryImpactModel:
         Returns impact metrics including averages with/without star and statistical significance
         """
         # Get teammate's games
-        teammate_games = self.player_stats[
-            self.player_stats['PLAYER_ID'] == teammate_id
-        ].copy()
+        teammate_games = self._player_games(teammate_id)
         
         if len(teammate_games) == 0:
             return None
         
         # Get star player's games (games they actually played)
-        star_games = self.player_stats[
-            self.player_stats['PLAYER_ID'] == star_player_id
-        ]['GAME_ID'].unique()
+        star_games = self._games_played(star_player_id)
         
         # Split teammate games
-        with_star = teammate_games[teammate_games['GAME_ID'].isin(star_games)]
-        without_star = teammate_games[~teammate_games['GAME_ID'].isin(star_games)]
+        star_in = _isin_sorted(teammate_games['GAME_ID'], star_games)
+        with_star = teammate_games[star_in]
+        without_star = teammate_games[~star_in]
         
         if len(without_star) < min_games:
             return None
@@ -87,7 +228,11 @@ class InjuryImpactModel:
         
         # Statistical test
         if len(with_star) > 0 and len(without_star) > 0:
-            t_stat, p_value = stats.ttest_ind(without_star[stat], with_star[stat])
+            a = without_star[stat].to_numpy(dtype=float)
+            b = with_star[stat].to_numpy(dtype=float)
+            t_stat, p_value = stats.ttest_ind_from_stats(
+                a.mean(), a.std(ddof=1), len(a), b.mean(), b.std(ddof=1), len(b)
+            )
         else:
             t_stat, p_value = None, None
         
@@ -106,82 +251,182 @@ class InjuryImpactModel:
         
         return impact
     
-    def build_prediction_model(self, player_id, stat='PTS'):
-        """
-        Build a machine learning model to predict player performance
+    def _prediction_features(self, stat='PTS'):
         """
-        player_data = self.player_stats[
-            self.player_stats['PLAYER_ID'] == player_id
-        ].copy()
+        Feature table for the prediction model, computed for every player at once
         
-        if len(player_data) < 20:
-            return None
+        Rows follow _by_player (each player's games oldest first). The table is
+        cached per stat until the next load_data, so fitting and predicting
+        share one pass of rolling features.
+        """
+        if stat in self._feature_cache:
+            return self._feature_cache[stat]
+        
+        games = self._by_player.reset_index(drop=True)
+        rolling_avg, rolling_std = _rolling_mean_std(games[stat], games['PLAYER_ID'], 5)
+        self._feature_cache[stat] = pd.DataFrame({
+            'PLAYER_ID': games['PLAYER_ID'],
+            'MIN': games['MIN'],
+            'HOME': games['HOME'],
+            'ROLLING_AVG_5': rolling_avg,
+            'ROLLING_STD_5': rolling_std,
+            stat: games[stat]
+        })
+        return self._feature_cache[stat]
+    
+    def _global_training_data(self, stat):
+        """
+        Training matrix for the shared model of `stat`
         
-        # Feature engineering
-        player_data['HOME'] = (player_data['MATCHUP'].str.contains('vs.')).astype(int)
-        player_data['ROLLING_AVG_5'] = player_data[stat].rolling(5, min_periods=1).mean()
-        player_data['ROLLING_STD_5'] = player_data[stat].rolling(5, min_periods=1).std()
+        Returns (X, y, player_codes, categorical), or None with too few games
+        """
+        player_data = self._prediction_features(stat)
         
         # Prepare features
-        feature_cols = ['MIN', 'HOME', 'ROLLING_AVG_5']
+        feature_cols = ['PLAYER_CODE', 'MIN', 'HOME', 'ROLLING_AVG_5', 'ROLLING_STD_5']
+        player_codes = {player_id: code for code, player_id in
+                        enumerate(player_data['PLAYER_ID'].unique())}
+        player_data = player_data.assign(PLAYER_CODE=player_data['PLAYER_ID'].map(player_codes))
         player_data = player_data.dropna(subset=feature_cols + [stat])
         
         if len(player_data) < 10:
             return None
         
-        X = player_data[feature_cols]
-        y = player_data[stat]
+        # Plain numpy arrays, so fit/predict skip pandas feature-name validation;
+        # float64 is the booster's internal dtype, so no conversion copy either
+        X = player_data[feature_cols].to_numpy(dtype=np.float64)
+        y = player_data[stat].to_numpy(dtype=np.float64)
         
-        # Use Random Forest for better predictions
-        model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=5)
-        model.fit(X, y)
+        # The booster only supports up to 255 categories; with more players
+        # (e.g. a league-wide dataset) the code is used as a plain number
+        categorical = [0] if len(player_codes) <= 255 else None
         
-        return {
+        return X, y, player_codes, categorical
+    
+    def _store_global_model(self, stat, model, X, y, player_codes):
+        """Record a fitted shared model under its stat"""
+        self.global_models[stat] = {
             'model': model,
-            'features': feature_cols,
+            'features': ['PLAYER_CODE', 'MIN', 'HOME', 'ROLLING_AVG_5', 'ROLLING_STD_5'],
+            'player_codes': player_codes,
             'mean_error': np.abs(y - model.predict(X)).mean()
         }
+        return self.global_models[stat]
+    
+    def fit_global_model(self, stat='PTS'):
+        """
+        Build a single machine learning model that predicts `stat` for every player
+        
+        The player is a categorical feature, so one boosted model replaces
+        training a separate forest for each player.
+        """
+        training = self._global_training_data(stat)
+        if training is None:
+            return None
+        
+        X, y, player_codes, categorical = training
+        return self._store_global_model(stat, _fit_booster(X, y, categorical), X, y, player_codes)
+    
+    def fit_global_models(self, stats=('PTS', 'REB', 'AST'), n_jobs=-1):
+        """
+        Fit the shared model for several stats in parallel worker processes
+        
+        Returns a dict of {stat: model info}, skipping stats with too few games
+        """
+        training = {stat: self._global_training_data(stat) for stat in stats}
+        training = {stat: data for stat, data in training.items() if data is not None}
+        
+        models = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_booster)(X, y, categorical)
+            for X, y, _, categorical in training.values()
+        )
+        
+        return {
+            stat: self._store_global_model(stat, model, X, y, player_codes)
+            for (stat, (X, y, player_codes, _)), model in zip(training.items(), models)
+        }
+    
+    def build_prediction_model(self, player_id, stat='PTS'):
+        """
+        Build a machine learning model to predict player performance
+        
+        Returns the shared model for `stat` (see fit_global_model), or None
+        if the player doesn't have enough games to rely on it
+        """
+        player_games = len(self._player_games(player_id))
+        if player_games < 20:
+            return None
+        
+        model_info = self.global_models.get(stat) or self.fit_global_model(stat)
+        if model_info is None or player_id not in model_info['player_codes']:
+            return None
+        
+        return model_info
     
     def predict_performance(self, player_id, stat='PTS', is_home=True, expected_minutes=30):
         """
         Predict player performance for upcoming game
         """
-        player_data = self.player_stats[
-            self.player_stats['PLAYER_ID'] == player_id
-        ].copy()
+        player_data = self._player_games(player_id)
         
         if len(player_data) < 10:
             # Fall back to simple average
             return player_data[stat].mean() if len(player_data) > 0 else None
         
-        # Calculate rolling average
-        rolling_avg = player_data[stat].tail(5).mean()
-        rolling_std = player_data[stat].tail(5).std()
-        
-        # Build model if not exists
-        if player_id not in self.models:
-            model_data = self.build_prediction_model(player_id, stat)
-            if model_data:
-                self.models[player_id] = model_data
-        
-        # Make prediction
-        if player_id in self.models:
-            model_info = self.models[player_id]
-            features = pd.DataFrame({
-                'MIN': [expected_minutes],
-                'HOME': [1 if is_home else 0],
-                'ROLLING_AVG_5': [rolling_avg]
-            })
-            prediction = model_info['model'].predict(features)[0]
-        else:
-            prediction = rolling_avg
+        return self.predict_performances([player_id], stat, is_home, expected_minutes).iloc[0].to_dict()
+    
+    def predict_performances(self, player_ids, stat='PTS', is_home=True, expected_minutes=30):
+        """
+        Predict upcoming game performance for several players with one model call
         
-        return {
-            'prediction': prediction,
-            'std': rolling_std,
-            'confidence_interval_low': prediction - 1.96 * rolling_std,
-            'confidence_interval_high': prediction + 1.96 * rolling_std
-        }
+        is_home and expected_minutes can be single values or one per player.
+        Returns a DataFrame indexed by player ID. Players with fewer than 10
+        games get their simple average and no confidence interval.
+        """
+        player_ids = pd.Index(player_ids)
+        player_data = self._by_player.loc[self._player_ids.intersection(player_ids)]
+        
+        games = player_data.groupby(level=0).size().reindex(player_ids, fill_value=0).to_numpy()
+        season_avg = player_data.groupby(level=0)[stat].mean().reindex(player_ids)
+        
+        # Rolling average as of each player's latest game
+        recent = (
+            self._prediction_features(stat)
+            .drop_duplicates('PLAYER_ID', keep='last')
+            .set_index('PLAYER_ID')
+            .reindex(player_ids)
+            .rename(columns={'ROLLING_AVG_5': 'mean', 'ROLLING_STD_5': 'std'})
+        )
+        
+        enough = games >= 10
+        predictions = pd.DataFrame({
+            'prediction': np.where(enough, recent['mean'], season_avg).astype(float),
+            'std': np.where(enough, recent['std'], np.nan).astype(float)
+        }, index=player_ids)
+        
+        # Make predictions for everyone the model covers in one call
+        use_model = games >= 20
+        model_info = None
+        if use_model.any():
+            model_info = self.global_models.get(stat) or self.fit_global_model(stat)
+        if model_info:
+            use_model &= player_ids.isin(list(model_info['player_codes']))
+        if model_info and use_model.any():
+            # Columns in model_info['features'] order
+            features = np.column_stack([
+                player_ids.map(model_info['player_codes']).to_numpy(dtype=np.float64, na_value=np.nan),
+                np.broadcast_to(expected_minutes, len(player_ids)),
+                np.broadcast_to(is_home, len(player_ids)),
+                recent['mean'].to_numpy(),
+                recent['std'].to_numpy()
+            ])[use_model]
+            predictions.loc[use_model, 'prediction'] = model_info['model'].predict(features)
+        
+        margin = 1.96 * predictions['std']
+        predictions['confidence_interval_low'] = predictions['prediction'] - margin
+        predictions['confidence_interval_high'] = predictions['prediction'] + margin
+        
+        return predictions
     
     def calculate_betting_edge(self, prediction, betting_line, std_dev):
         """
@@ -192,13 +437,14 @@ class InjuryImpactModel:
         
         # Probability of going over
         z_score = (betting_line - prediction) / std_dev
-        prob_over = 1 - stats.norm.cdf(z_score)
-        prob_under = stats.norm.cdf(z_score)
+        prob_under = 0.5 * math.erfc(-z_score / math.sqrt(2))  # Standard normal CDF
+        prob_over = 1 - prob_under
         
         # Calculate expected value (assuming -110 odds on both sides)
         # Need 52.4% win rate to break even at -110
-        over_ev = (prob_over * 0.909) - (1 - prob_over)
-        under_ev = (prob_under * 0.909) - (1 - prob_under)
+        # (p * 0.909 - (1 - p) simplifies to 1.909 * p - 1)
+        over_ev = prob_over * 1.909 - 1
+        under_ev = prob_under * 1.909 - 1
         
         result = {
             'prediction': prediction,
@@ -226,50 +472,130 @@ class InjuryImpactModel:
         
         return result
     
+    def calculate_betting_edge_vec(self, predictions, lines, stds):
+        """
+        Vectorized calculate_betting_edge over arrays of predictions, lines and
+        standard deviations. Returns a DataFrame with one row per prediction.
+        """
+        predictions = np.asarray(predictions, dtype=float)
+        lines = np.asarray(lines, dtype=float)
+        stds = np.asarray(stds, dtype=float)
+        stds = np.where(np.isnan(stds) | (stds == 0), predictions * 0.15, stds)  # Assume 15% coefficient of variation
+        
+        # Probability of going over
+        z_score = lines - predictions
+        z_score /= stds
+        prob_under = ndtr(z_score)
+        prob_over = 1 - prob_under
+        
+        # Calculate expected value (assuming -110 odds on both sides);
+        # p * 0.909 - (1 - p) folds to 1.909 * p - 1, updated in place
+        over_ev = prob_over * 1.909
+        over_ev -= 1
+        under_ev = prob_under * 1.909
+        under_ev -= 1
+        
+        # Determine recommendation (require at least 5% edge)
+        bet_over = over_ev > 0.05
+        bet_under = under_ev > 0.05
+        
+        return pd.DataFrame({
+            'prediction': predictions,
+            'line': lines,
+            'prob_over': prob_over,
+            'prob_under': prob_under,
+            'over_ev': over_ev,
+            'under_ev': under_ev,
+            'std_dev': stds,
+            'recommendation': np.select([bet_over, bet_under], ['OVER', 'UNDER'], default='NO BET'),
+            'edge': np.select([bet_over, bet_under], [over_ev, under_ev],
+                              default=np.maximum(over_ev, under_ev)),
+            'confidence': np.select([bet_over, bet_under], [prob_over, prob_under],
+                                    default=np.maximum(prob_over, prob_under))
+        })
+    
     def analyze_injury_impact(self, injured_player_id, team_id, stat='PTS', top_n=5):
         """
         Analyze which teammates are most affected by a player's absence
+        
+        All teammates are measured in one groupby over their box scores split
+        by whether the injured player was in the lineup, rather than calling
+        measure_teammate_impact once per teammate.
         """
+        min_games = 3
+        
         # Get all teammates
-        team_games = self.player_stats[
-            self.player_stats['TEAM_ID'] == team_id
-        ]
+        team_games = self._team_games(team_id)
         
         teammates = team_games['PLAYER_ID'].unique()
-        teammates = [t for t in teammates if t != injured_player_id]
+        teammates = teammates[teammates != injured_player_id]
         
-        impacts = []
+        # Tag each teammate game with whether the star played in it
+        star_games = self._games_played(injured_player_id)
         
-        for teammate_id in teammates:
-            impact = self.measure_teammate_impact(
-                injured_player_id, 
-                teammate_id, 
-                stat,
-                min_games=3
-            )
-            
-            if impact and impact['difference'] > 1:  # At least 1 point difference
-                teammate_name = team_games[
-                    team_games['PLAYER_ID'] == teammate_id
-                ]['PLAYER_NAME'].iloc[0]
-                
-                impacts.append({
-                    'player_id': teammate_id,
-                    'player_name': teammate_name,
-                    **impact
-                })
-        
-        # Sort by absolute difference
-        impacts_df = pd.DataFrame(impacts)
+        teammate_games = self._by_player.loc[teammates].reset_index(drop=True)
+        teammate_games = teammate_games.assign(STAR_IN=_isin_sorted(teammate_games['GAME_ID'], star_games))
+        
+        # Only teammates with enough games without the star can qualify, so
+        # drop everyone else before aggregating
+        without_star_games = teammate_games.loc[~teammate_games['STAR_IN'], 'PLAYER_ID'].value_counts()
+        eligible = without_star_games.index[without_star_games >= min_games]
+        if len(eligible) == 0:
+            return pd.DataFrame()
+        teammate_games = teammate_games[teammate_games['PLAYER_ID'].isin(eligible)]
+        
+        # With/without splits for every teammate at once
+        splits = (
+            teammate_games.groupby(['PLAYER_ID', 'STAR_IN'])[stat]
+            .agg(['mean', 'std', 'size'])
+            .unstack('STAR_IN')
+            .reindex(columns=pd.MultiIndex.from_product([['mean', 'std', 'size'], [True, False]]))
+        )
+        
+        with_star_avg = splits[('mean', True)]
+        without_star_avg = splits[('mean', False)]
+        with_star_std = splits[('std', True)]
+        without_star_std = splits[('std', False)]
+        with_star_count = splits[('size', True)].fillna(0).astype(int)
+        without_star_count = splits[('size', False)].fillna(0).astype(int)
+        difference = without_star_avg - with_star_avg
+        
+        # Statistical test (pooled-variance t-test, same as stats.ttest_ind)
+        _, p_value = stats.ttest_ind_from_stats(
+            without_star_avg.to_numpy(), without_star_std.to_numpy(), without_star_count.to_numpy(),
+            with_star_avg.to_numpy(), with_star_std.to_numpy(), with_star_count.to_numpy()
+        )
+        p_value = np.where((with_star_count > 0) & (without_star_count > 0), p_value, np.nan)
+        
+        player_names = team_games.groupby('PLAYER_ID')['PLAYER_NAME'].first()
+        
+        impacts_df = pd.DataFrame({
+            'player_id': splits.index,
+            'player_name': player_names.reindex(splits.index).to_numpy(),
+            'with_star_avg': with_star_avg.to_numpy(),
+            'without_star_avg': without_star_avg.to_numpy(),
+            'difference': difference.to_numpy(),
+            'percent_change': np.where(with_star_avg > 0, difference / with_star_avg * 100, 0),
+            'with_star_count': with_star_count.to_numpy(),
+            'without_star_count': without_star_count.to_numpy(),
+            'p_value': p_value,
+            'significant': p_value < 0.05,
+            'with_star_std': with_star_std.to_numpy(),
+            'without_star_std': without_star_std.to_numpy()
+        })
+        
+        # Keep teammates with at least 1 point difference
+        impacts_df = impacts_df[impacts_df['difference'] > 1]
+        
+        # Largest differences first; a partial sort since only top_n are kept
         if len(impacts_df) > 0:
-            impacts_df = impacts_df.sort_values('difference', ascending=False)
-            return impacts_df.head(top_n)
+            return impacts_df.nlargest(top_n, 'difference').reset_index(drop=True)
         
         return pd.DataFrame()
     
     def find_betting_opportunities(self, injured_player_id, injured_player_name, 
                                    team_id, betting_lines, stat='PTS', 
-                                   min_edge=0.05):
+                                   min_edge=0.05, verbose=False, logger=None):
         """
         Find betting opportunities when a star player is injured
         
@@ -280,86 +606,100 @@ class InjuryImpactModel:
         - betting_lines: Dict of {player_id: betting_line} or {player_name: betting_line}
         - stat: Stat to analyze (default: PTS)
         - min_edge: Minimum edge required (default: 5%)
+        - verbose: Print the analysis report (default: False)
+        - logger: Optional logging.Logger; the report goes to logger.info instead of stdout
         
         Returns DataFrame of betting opportunities
         """
-        print(f"\n{'='*80}")
-        print(f"ANALYZING IMPACT: {injured_player_name} OUT")
-        print(f"{'='*80}\n")
+        report = [
+            f"\n{'='*80}",
+            f"ANALYZING IMPACT: {injured_player_name} OUT",
+            f"{'='*80}\n"
+        ]
         
         # Analyze teammate impacts
         impacts = self.analyze_injury_impact(injured_player_id, team_id, stat)
         
         if len(impacts) == 0:
-            print("No significant impacts found")
+            report.append("No significant impacts found")
+            self._emit_report(report, verbose, logger)
             return pd.DataFrame()
         
-        opportunities = []
-        
-        print(f"Top Affected Teammates:")
-        print(f"{'-'*80}")
-        
-        for _, player_impact in impacts.iterrows():
-            player_id = player_impact['player_id']
-            player_name = player_impact['player_name']
-            
-            # Get betting line (check both by ID and name)
-            betting_line = None
-            if player_id in betting_lines:
-                betting_line = betting_lines[player_id]
-            elif player_name in betting_lines:
-                betting_line = betting_lines[player_name]
-            
-            if betting_line is None:
-                print(f"  {player_name}: +{player_impact['difference']:.1f} {stat} "
-                      f"(No betting line available)")
-                continue
-            
-            # Predict performance without injured player
-            baseline = self.calculate_baseline(player_id, stat)
-            if not baseline:
-                continue
-            
-            # Use the "without star" average as prediction
-            prediction = player_impact['without_star_avg']
-            std_dev = player_impact['without_star_std']
+        # Get betting lines (check both by ID and name)
+        lines = impacts['player_id'].map(betting_lines).fillna(
+            impacts['player_name'].map(betting_lines)
+        )
+        has_line = lines.notna().to_numpy()
+        has_history = impacts['player_id'].isin(self._player_ids).to_numpy()
+        
+        # Use the "without star" average as prediction and price every line at once
+        bets = self.calculate_betting_edge_vec(
+            impacts['without_star_avg'], lines, impacts['without_star_std']
+        )
+        is_opportunity = has_line & has_history & (bets['edge'].to_numpy() >= min_edge)
+        
+        picks = impacts[is_opportunity]
+        picked_bets = bets[is_opportunity]
+        opportunities = pd.DataFrame({
+            'Player': picks['player_name'].to_numpy(),
+            'Stat': stat,
+            'Prediction': picked_bets['prediction'].to_numpy(),
+            'Betting Line': picked_bets['line'].to_numpy(),
+            'Recommendation': picked_bets['recommendation'].to_numpy(),
+            'Edge %': picked_bets['edge'].to_numpy() * 100,
+            'Confidence %': picked_bets['confidence'].to_numpy() * 100,
+            'Historical w/ Star': picks['with_star_avg'].to_numpy(),
+            'Historical w/o Star': picks['without_star_avg'].to_numpy(),
+            'Difference': picks['difference'].to_numpy(),
+            'Sample Size': picks['without_star_count'].to_numpy()
+        })
+        
+        if verbose or logger is not None:
+            report.append(f"Top Affected Teammates:")
+            report.append(f"{'-'*80}")
             
-            # Calculate betting edge
-            bet_analysis = self.calculate_betting_edge(prediction, betting_line, std_dev)
+            rows = impacts.assign(
+                line=lines.to_numpy(), has_history=has_history, opportunity=is_opportunity,
+                prediction=bets['prediction'].to_numpy(),
+                recommendation=bets['recommendation'].to_numpy(), edge=bets['edge'].to_numpy()
+            )
+            for row in rows.itertuples(index=False):
+                if pd.isna(row.line):
+                    report.append(f"  {row.player_name}: +{row.difference:.1f} {stat} "
+                                  f"(No betting line available)")
+                elif not row.has_history:
+                    continue
+                elif row.opportunity:
+                    report.extend([
+                        f"  ✓ {row.player_name}:",
+                        f"      Avg with {injured_player_name}: {row.with_star_avg:.1f}",
+                        f"      Avg without {injured_player_name}: {row.without_star_avg:.1f}",
+                        f"      Difference: +{row.difference:.1f}",
+                        f"      Betting Line: {row.line}",
+                        f"      Prediction: {row.prediction:.1f}",
+                        f"      → {row.recommendation} (Edge: {row.edge*100:.1f}%)"
+                    ])
+                else:
+                    report.append(f"  {row.player_name}: +{row.difference:.1f} {stat} "
+                                  f"(Line: {row.line}, Edge: {row.edge*100:.1f}% - Below threshold)")
             
-            if bet_analysis['edge'] >= min_edge:
-                opportunities.append({
-                    'Player': player_name,
-                    'Stat': stat,
-                    'Prediction': prediction,
-                    'Betting Line': betting_line,
-                    'Recommendation': bet_analysis['recommendation'],
-                    'Edge %': bet_analysis['edge'] * 100,
-                    'Confidence %': bet_analysis['confidence'] * 100,
-                    'Historical w/ Star': player_impact['with_star_avg'],
-                    'Historical w/o Star': player_impact['without_star_avg'],
-                    'Difference': player_impact['difference'],
-                    'Sample Size': player_impact['without_star_count']
-                })
-                
-                print(f"  ✓ {player_name}:")
-                print(f"      Avg with {injured_player_name}: {player_impact['with_star_avg']:.1f}")
-                print(f"      Avg without {injured_player_name}: {player_impact['without_star_avg']:.1f}")
-                print(f"      Difference: +{player_impact['difference']:.1f}")
-                print(f"      Betting Line: {betting_line}")
-                print(f"      Prediction: {prediction:.1f}")
-                print(f"      → {bet_analysis['recommendation']} (Edge: {bet_analysis['edge']*100:.1f}%)")
+            report.append(f"\n{'='*80}")
+            if len(opportunities) > 0:
+                report.append(f"BETTING OPPORTUNITIES FOUND: {len(opportunities)}")
             else:
-                print(f"  {player_name}: +{player_impact['difference']:.1f} {stat} "
-                      f"(Line: {betting_line}, Edge: {bet_analysis['edge']*100:.1f}% - Below threshold)")
+                report.append("NO PROFITABLE OPPORTUNITIES FOUND")
+            report.append(f"{'='*80}\n")
+            self._emit_report(report, verbose, logger)
         
         if len(opportunities) > 0:
-            print(f"\n{'='*80}")
-            print(f"BETTING OPPORTUNITIES FOUND: {len(opportunities)}")
-            print(f"{'='*80}\n")
-            return pd.DataFrame(opportunities).sort_values('Edge %', ascending=False)
-        else:
-            print(f"\n{'='*80}")
-            print("NO PROFITABLE OPPORTUNITIES FOUND")
-            print(f"{'='*80}\n")
-            return pd.DataFrame()
+            return opportunities.sort_values('Edge %', ascending=False)
+        
+        return pd.DataFrame()
+    
+    def _emit_report(self, report, verbose, logger):
+        """Write a finished report to the logger, or print it when verbose"""
+        text = "\n".join(report)
+        if logger is not None:
+            logger.info(text)
+        elif verbose:
+            print(text)
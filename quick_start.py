@@ -7,7 +7,6 @@ when you hear about an injury.
 
 from injury_impact_model import InjuryImpactModel
 from data_collector import NBADataCollector
-import pandas as pd
 
 
 def quick_analysis(injured_player_name, team_abbrev, betting_lines_dict):
@@ -54,24 +53,17 @@ def quick_analysis(injured_player_name, team_abbrev, betting_lines_dict):
     
     # Collect game logs
     print("Collecting game logs (this may take a minute)...")
-    all_game_logs = []
-    
-    for _, player in roster.iterrows():
-        player_id = player['PLAYER_ID']
-        game_logs = collector.fetch_player_game_logs(player_id)
-        if len(game_logs) > 0:
-            all_game_logs.append(game_logs)
-        
-        # Small delay to avoid rate limiting
-        import time
-        time.sleep(0.6)
+    # Fetched concurrently; the collector's rate limiter spaces out the requests
+    all_game_logs = list(
+        collector.fetch_game_logs_for_players(roster['PLAYER_ID'], max_workers=5).values()
+    )
     
     if not all_game_logs:
         print("Error: Could not collect game logs")
         return
     
     # Combine game logs
-    player_stats = pd.concat(all_game_logs, ignore_index=True)
+    player_stats = collector.combine_game_logs(all_game_logs)
     games = player_stats[['GAME_ID', 'GAME_DATE', 'MATCHUP']].drop_duplicates()
     
     print(f"Loaded {len(player_stats)} player performances from {len(games)} games")
@@ -87,7 +79,8 @@ def quick_analysis(injured_player_name, team_abbrev, betting_lines_dict):
         team_id=team_id,
         betting_lines=betting_lines_dict,
         stat='PTS',
-        min_edge=0.03  # 3% minimum edge
+        min_edge=0.03,  # 3% minimum edge
+        verbose=True
     )
     
     # Display results